@@ -1,26 +1,50 @@
 import os
+import pickle
+import sys
 import asyncio
+import atexit
 from dotenv import load_dotenv
-from metaapi_cloud_sdk import MetaApi
 from telethon import TelegramClient
 from telethon.sessions import StringSession
 from telethon.errors import TypeNotFoundError, AuthKeyDuplicatedError, ServerError, FloodWaitError
 import time
+import collections
 import datetime
+import functools
+from typing import NamedTuple, Optional
 import aiohttp
 import logging
-import pytz  # Add import for timezone handling
+import logging.handlers
+import queue
+import random
 
-# Set up logging - only show warnings and errors by default
+try:
+    import uvloop  # Optional faster event loop
+except ImportError:
+    uvloop = None
+
+_UTC = datetime.timezone.utc
+
+# Set up logging - only show warnings and errors by default. Records are handed to a queue
+# and written to stderr by a listener thread, so log I/O never blocks the event loop
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
 logging.basicConfig(level=logging.WARNING, 
                     format='%(asctime)s - %(levelname)s - %(message)s',
-                    handlers=[logging.StreamHandler()])
+                    handlers=[logging.handlers.QueueHandler(_log_queue)])
+# Start the listener alongside the handler so importers get log output too; stopping it at exit
+# flushes any queued records
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger('keyroom_manager')
 
 # Create a special logger just for message events
 msg_logger = logging.getLogger('message_events')
 msg_logger.setLevel(logging.INFO)
 
+# Counts of errors handled by the monitor loop, by kind
+error_counts = collections.Counter()
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -32,41 +56,211 @@ METAAPI_ACCOUNT_ID = os.getenv("METAAPI_ACCOUNT_ID")
 API_ID = int(os.getenv("API_ID"))
 API_HASH = os.getenv("API_HASH")
 FORWARD_CHANNEL_ID = os.getenv("FORWARD_CHANNEL_ID")  # e.g. "-1002357820440"
+_FORWARD_CHANNEL_ID_INT = int(FORWARD_CHANNEL_ID)
 
 # Path to save Telegram session
 SESSION_FILE = os.path.join(os.path.dirname(__file__), 'telegram_session.txt')
 
+# Path to save pending order and position messages and processed orders between runs
+STATE_FILE = os.path.join(os.path.dirname(__file__), 'monitor_state.pkl')
+
+# In-memory copy of the session file contents, kept in sync by load/save
+_session_cache = None
+
 def load_session_string():
-    """Load the session string from file if it exists."""
+    """Load the session string from file if it exists, caching it after the first read."""
+    global _session_cache
+    if _session_cache is not None:
+        return _session_cache
     try:
         if os.path.exists(SESSION_FILE):
             with open(SESSION_FILE, 'r') as f:
-                return f.read().strip()
+                _session_cache = f.read().strip()
+                return _session_cache
     except Exception as e:
-        logger.error(f"Error reading session file: {e}")
+        logger.error("Error reading session file: %s", e)
     return None
 
 def save_session_string(session_str):
-    """Save the session string to file."""
+    """Save the session string to file atomically, skipping unchanged strings."""
+    global _session_cache
+    if session_str == _session_cache:
+        return
     try:
-        with open(SESSION_FILE, 'w') as f:
+        tmp_file = SESSION_FILE + '.tmp'
+        with open(tmp_file, 'w') as f:
             f.write(session_str)
+        os.replace(tmp_file, SESSION_FILE)
+        _session_cache = session_str
         msg_logger.info("Session string saved successfully")
     except Exception as e:
-        logger.error(f"Error saving session string: {e}")
+        logger.error("Error saving session string: %s", e)
+
+def load_monitor_state():
+    """Load (pending_order_messages, processed_orders, position_messages) saved by a previous run, or empty state."""
+    try:
+        if os.path.exists(STATE_FILE):
+            with open(STATE_FILE, 'rb') as f:
+                state = pickle.load(f)
+            # Files written before position messages were saved only hold the first two
+            pending_order_messages, processed_orders = state[:2]
+            position_messages = state[2] if len(state) > 2 else {}
+            return pending_order_messages, collections.OrderedDict.fromkeys(processed_orders), position_messages
+    except Exception as e:
+        logger.error("Error reading monitor state file: %s", e)
+    return {}, collections.OrderedDict(), {}
+
+def save_monitor_state(pending_order_messages, processed_orders, position_messages):
+    """Save pending order and position message ids and processed orders to file atomically."""
+    try:
+        state = (dict(pending_order_messages), list(processed_orders), dict(position_messages))
+        tmp_file = STATE_FILE + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(state, f)
+        os.replace(tmp_file, STATE_FILE)
+    except Exception as e:
+        logger.error("Error saving monitor state: %s", e)
+
+# Display label and emoji for MetaApi pending order types
+_ORDER_META = {
+    "ORDER_TYPE_BUY_LIMIT": ("BUY LIMIT", "🔹"),
+    "ORDER_TYPE_BUY_STOP": ("BUY STOP", "🔹"),
+    "ORDER_TYPE_BUY_STOP_LIMIT": ("BUY STOP LIMIT", "🔹"),
+    "ORDER_TYPE_SELL_LIMIT": ("SELL LIMIT", "🔸"),
+    "ORDER_TYPE_SELL_STOP": ("SELL STOP", "🔸"),
+    "ORDER_TYPE_SELL_STOP_LIMIT": ("SELL STOP LIMIT", "🔸"),
+}
+_DEFAULT_ORDER_EMOJI = "🔷"
+
+# Trade direction for MetaApi position types, and its chart emoji
+_POSITION_ACTIONS = {"POSITION_TYPE_BUY": "BUY", "POSITION_TYPE_SELL": "SELL"}
+_ACTION_EMOJI = {"BUY": "📈", "SELL": "📉"}
+
+# Closing message templates keyed by close reason
+_CLOSE_TEMPLATES = {
+    "Closed via TP": "**🤑 TP {symbol}**\n__ID: {pos_id}__\n\n💰 Closing Price: {closing_price}\n 📊 Points: {delta}",
+    "Closed via SL": "**⛔️ SL {symbol}**\n__ID: {pos_id}__\n\n💰 Closing Price: {closing_price}\n 📊 Points: {delta}",
+    "Manual Closing": "**{emoji} CLOSE {symbol}**\n__ID: {pos_id}__\n\n💰 Closing Price: {closing_price}\n 📊 Points: {delta}",
+}
+_TRIGGERED_TEMPLATE = "**{emoji} TRIGGERED {action} {symbol}**\n__ID: {pos_id}__\n\n💵 Entry Price: {open_price}\n⛔️ SL: `{sl}`   ✅ TP: `{tp}`\n\n"
+_MARKET_TEMPLATE = "**{emoji} {action} {symbol}**\n__ID: {pos_id}__\n\n💵 Entry Price: {open_price}\n⛔️ SL: `{sl}`   ✅ TP: `{tp}`\n\n"
+_PENDING_TEMPLATE = "**{emoji} PENDING {action} {symbol}**\n__ID: {order_id}__\n\n💵 Trigger Price: {price}\n⛔️ SL: `{sl}`   ✅ TP: `{tp}`\n\n"
+_CANCELED_TEMPLATE = "**🚫 CANCELED ORDER {symbol}**\n__ID: {order_id}__\n\nOrder was canceled before being triggered"
+
+# Cache of broker symbols with the '.s' suffix stripped
+_SYMBOL_NORM = {}
+
+def normalize_symbol(symbol):
+    """Strip the broker '.s' suffix from a symbol, memoized per raw symbol."""
+    normalized = _SYMBOL_NORM.get(symbol)
+    if normalized is None:
+        normalized = _SYMBOL_NORM.setdefault(symbol, symbol[:-2] if symbol.endswith('.s') else symbol)
+    return normalized
+
+class PositionState(NamedTuple):
+    """Tracked state of an open position, fixed at the values first seen."""
+    open_price: Optional[float]
+    tp: Optional[float]
+    sl: Optional[float]
+    trade_type: str
+    symbol: str
+    order_id: Optional[str]
+    action: str  # "BUY" or "SELL"
+
+class PendingOrderState(NamedTuple):
+    """Tracked state of a pending order."""
+    price: Optional[float]
+    tp: Optional[float]
+    sl: Optional[float]
+    trade_type: str
+    symbol: str
+
+def _intern_id(trade_id):
+    """Intern string ids so the tracking dicts and sets can match keys by identity."""
+    return sys.intern(trade_id) if type(trade_id) is str else trade_id
+
+def _extract_position(pos):
+    """Return (id, open_price, tp, sl, type, symbol, order_id) from a MetaApi position dict or object."""
+    if isinstance(pos, dict):
+        get = pos.get
+        return (_intern_id(get('id')), get('openPrice'), get('takeProfit'), get('stopLoss'),
+                get('type', 'N/A'), normalize_symbol(get('symbol', 'N/A')), get('orderId'))
+    return (_intern_id(getattr(pos, 'id', None)), getattr(pos, 'openPrice', None), getattr(pos, 'takeProfit', None),
+            getattr(pos, 'stopLoss', None), getattr(pos, 'type', 'N/A'),
+            normalize_symbol(getattr(pos, 'symbol', 'N/A')), getattr(pos, 'orderId', None))
+
+def _extract_order(order):
+    """Return (id, price, tp, sl, type, symbol) from a MetaApi pending order dict or object."""
+    if isinstance(order, dict):
+        get = order.get
+        return (_intern_id(get('id')), get('openPrice'), get('takeProfit'), get('stopLoss'),
+                get('type', 'N/A'), normalize_symbol(get('symbol', 'N/A')))
+    return (_intern_id(getattr(order, 'id', None)), getattr(order, 'openPrice', None), getattr(order, 'takeProfit', None),
+            getattr(order, 'stopLoss', None), getattr(order, 'type', 'N/A'),
+            normalize_symbol(getattr(order, 'symbol', 'N/A')))
+
+def format_position_message(pos_id, position, triggered=False):
+    """Format the notification for a newly opened position, or a triggered pending order."""
+    template = _TRIGGERED_TEMPLATE if triggered else _MARKET_TEMPLATE
+    return template.format_map({
+        "emoji": _ACTION_EMOJI[position.action], "action": position.action, "symbol": position.symbol,
+        "pos_id": pos_id, "open_price": position.open_price, "sl": position.sl, "tp": position.tp})
+
+@functools.lru_cache(maxsize=256, typed=True)
+def _price_decimals(ref_price):
+    """Number of decimals in ref_price, cached since open prices repeat across closes."""
+    ref_str = str(ref_price)
+    if '.' in ref_str:
+        return len(ref_str.split('.')[1])
+    return 0
 
 def format_delta(delta, ref_price):
     """Round delta to the same number of decimals as ref_price."""
     try:
-        ref_str = str(ref_price)
-        if '.' in ref_str:
-            decimals = len(ref_str.split('.')[1])
-        else:
-            decimals = 0
-        return round(delta, decimals)
+        return round(delta, _price_decimals(ref_price))
     except Exception:
         return round(delta, 2)
 
+# Listener class, created on first use so the MetaApi SDK is only imported by the monitor
+_TerminalChangeListener = None
+
+def create_terminal_listener():
+    """Create a listener that wakes the monitor loop whenever MetaApi reports a change."""
+    global _TerminalChangeListener
+    if _TerminalChangeListener is None:
+        from metaapi_cloud_sdk import SynchronizationListener
+
+        class TerminalChangeListener(SynchronizationListener):
+            """Wake the monitor loop whenever MetaApi reports a position, order or deal change."""
+
+            def __init__(self):
+                super().__init__()
+                self.changed = asyncio.Event()
+
+            async def on_position_updated(self, instance_index, position):
+                self.changed.set()
+
+            async def on_position_removed(self, instance_index, position_id):
+                self.changed.set()
+
+            async def on_positions_replaced(self, instance_index, positions):
+                self.changed.set()
+
+            async def on_pending_order_updated(self, instance_index, order):
+                self.changed.set()
+
+            async def on_pending_order_completed(self, instance_index, order_id):
+                self.changed.set()
+
+            async def on_pending_orders_replaced(self, instance_index, orders):
+                self.changed.set()
+
+            async def on_deal_added(self, instance_index, deal):
+                self.changed.set()
+
+        _TerminalChangeListener = TerminalChangeListener
+    return _TerminalChangeListener()
+
 async def send_telegram_message(client, target_entity, message: str, reply_to=None):
     """Send a message to Telegram, optionally replying to another message.
     Returns the sent message object."""
@@ -79,99 +273,176 @@ async def send_telegram_message(client, target_entity, message: str, reply_to=No
     
     # Log the message being sent - extract first line for cleaner logs
     first_line = message.split('\n')[0] if '\n' in message else message
-    msg_logger.info(f"Sent to Telegram: {first_line[:50]}...")
+    msg_logger.info("Sent to Telegram: %s...", first_line[:50])
     
     return sent_message
 
-async def generate_status_message(current_positions, current_pending_orders, daily_closed_positions, daily_points, cancelled_orders=None):
-    """Generate a status message showing the current trading day overview."""
-    # Get current time in UTC
-    now_utc = datetime.datetime.now(pytz.UTC)
-    
-    # Format the date and time with timezone
-    date_str = now_utc.strftime("%d %b %Y")
-    time_str = now_utc.strftime("%H:%M:%S %Z")  # Added %Z for timezone abbreviation
-    
-    # Header with last update timestamp
-    message = f"📊 **TRADING OVERVIEW** 📊\n"
-    message += f"📅 __{date_str}__ | ⏱️ Last update: __{time_str}__\n\n"
+class TelegramSender:
+    """Pace outgoing Telegram messages through a bounded queue to stay under the flood limit.
+    Sends start at most `rate` times per second but run concurrently once started."""
+
+    def __init__(self, client, target_entity, rate=25, max_queue=100):
+        self.client = client
+        self.target_entity = target_entity
+        self.interval = 1 / rate
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self._pump_task = None
+        self._deliveries = set()
+
+    def start(self):
+        self._pump_task = asyncio.create_task(self._pump())
+
+    async def stop(self):
+        """Cancel the pump and any sends still in flight."""
+        tasks = list(self._deliveries)
+        if self._pump_task:
+            tasks.append(self._pump_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._pump_task = None
+
+    async def send(self, message: str, reply_to=None):
+        """Queue a message and wait for it to be sent. Returns the sent message object.
+        Waits for room when the queue is full, which pushes back on the monitor loop."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((message, reply_to, future))
+        return await future
+
+    async def _pump(self):
+        while True:
+            message, reply_to, future = await self.queue.get()
+            task = asyncio.create_task(self._deliver(message, reply_to, future))
+            self._deliveries.add(task)
+            task.add_done_callback(self._deliveries.discard)
+            await asyncio.sleep(self.interval)
+
+    async def _deliver(self, message, reply_to, future):
+        try:
+            sent_message = await send_telegram_message(self.client, self.target_entity, message, reply_to=reply_to)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(sent_message)
+
+async def flush_sends(sender, pending_sends):
+    """Send queued notifications together, storing each sent message id under its keys.
+    Entries are (message_store, keys, message, reply_to); only the id is kept since it is all a
+    later reply needs. Failed entries stay in pending_sends to be retried by the next flush."""
+    if not pending_sends:
+        return
+    results = await asyncio.gather(
+        *(sender.send(message, reply_to=reply_to) for _, _, message, reply_to in pending_sends),
+        return_exceptions=True)
+    send_error = None
+    failed_sends = []
+    for entry, result in zip(pending_sends, results):
+        if isinstance(result, BaseException):
+            send_error = send_error or result
+            failed_sends.append(entry)
+        else:
+            message_store, keys, _, _ = entry
+            for key in keys:
+                message_store[key] = result.id
+    pending_sends[:] = failed_sends
+    # Surface failures to the caller's error handling once every send has settled
+    if send_error:
+        raise send_error
+
+# Last rendered status body and the state it was rendered from
+_status_state_key = None
+_status_body = None
+
+# Status header and the wall-clock second it was formatted for
+_header_second = None
+_status_header = None
+
+def _render_status_body(current_positions, current_pending_orders, daily_closed_positions, daily_points, cancelled_orders):
+    """Render everything in the status message below the timestamp header."""
+    # Collect lines and join once at the end
+    parts = []
     
     # Active Positions Section
-    message += f"📌 **ACTIVE POSITIONS ({len(current_positions)})**\n"
+    parts.append(f"📌 **ACTIVE POSITIONS ({len(current_positions)})**")
     if current_positions:
-        for pos_id, (open_price, tp, sl, trade_type, symbol, _) in current_positions.items():
-            action = "BUY" if "buy" in trade_type.lower() else "SELL"
-            message += f"__{symbol} {action} | ID: {pos_id}__\n"
+        for pos_id, position in current_positions.items():
+            parts.append(f"__{position.symbol} {position.action} | ID: {pos_id}__")
     else:
-        message += "-\n"
+        parts.append("-")
     
-    message += "\n"
+    parts.append("")
     
     # Pending Orders Section
-    message += f"⏳ **PENDING ORDERS ({len(current_pending_orders)})**\n"
+    parts.append(f"⏳ **PENDING ORDERS ({len(current_pending_orders)})**")
     if current_pending_orders:
-        for order_id, (price, tp, sl, trade_type, symbol) in current_pending_orders.items():
-            if "BUY_LIMIT" in trade_type:
-                action = "BUY LIMIT"
-            elif "BUY_STOP" in trade_type:
-                action = "BUY STOP"
-            elif "SELL_LIMIT" in trade_type:
-                action = "SELL LIMIT"
-            elif "SELL_STOP" in trade_type:
-                action = "SELL STOP"
-            else:
-                action = trade_type
-                
-            message += f"__{symbol} {action} | ID: {order_id}__\n"
+        for order_id, order in current_pending_orders.items():
+            action, _ = _ORDER_META.get(order.trade_type, (order.trade_type, _DEFAULT_ORDER_EMOJI))
+            parts.append(f"__{order.symbol} {action} | ID: {order_id}__")
     else:
-        message += "-\n"
+        parts.append("-")
     
-    message += "\n"
+    parts.append("")
     
     # Today's Closed Positions
-    message += f"🏁 **TODAY'S CLOSED POSITIONS ({len(daily_closed_positions)})**\n"
+    parts.append(f"🏁 **TODAY'S CLOSED POSITIONS ({len(daily_closed_positions)})**")
     if daily_closed_positions:
         for pos_data in daily_closed_positions:
-            symbol = pos_data.get('symbol', 'Unknown')
-            points = pos_data.get('points', 0)
-            reason = pos_data.get('reason', 'Unknown')
-            pos_id = pos_data.get('id', 'Unknown')
-                
-            message += f"__{symbol} | Points: {points} | ID: {pos_id}__\n"
+            parts.append(f"__{pos_data.get('symbol', 'Unknown')} | Points: {pos_data.get('points', 0)} "
+                         f"| ID: {pos_data.get('id', 'Unknown')}__")
     else:
-        message += "-\n"
+        parts.append("-")
     
-    message += "\n"
+    parts.append("")
     
     # Cancelled Orders Section
     if cancelled_orders:
-        message += f"🚫 **TODAY'S CANCELLED ORDERS ({len(cancelled_orders)})**\n"
+        parts.append(f"🚫 **TODAY'S CANCELLED ORDERS ({len(cancelled_orders)})**")
         for order in cancelled_orders:
-            symbol = order.get('symbol', 'Unknown')
-            order_id = order.get('id', 'Unknown')
             order_type = order.get('type', 'Unknown')
-            price = order.get('price', 'Unknown')
-
-            if "BUY_LIMIT" in order_type:
-                action = "BUY LIMIT"
-            elif "BUY_STOP" in order_type:
-                action = "BUY STOP"
-            elif "SELL_LIMIT" in order_type:
-                action = "SELL LIMIT"
-            elif "SELL_STOP" in order_type:
-                action = "SELL STOP"
-            else:
-                action = order_type
-            
-            message += f"__{symbol} {action} | ID: {order_id}__\n"
+            action, _ = _ORDER_META.get(order_type, (order_type, _DEFAULT_ORDER_EMOJI))
+            parts.append(f"__{order.get('symbol', 'Unknown')} {action} | ID: {order.get('id', 'Unknown')}__")
         
-        message += "\n"
+        parts.append("")
     
     # Daily Performance Summary
     emoji = "🟢" if daily_points > 0 else "🔴" if daily_points < 0 else "⚪️"
-    message += f"{emoji} **TOTAL POINTS TODAY: {round(daily_points, 5)}**\n"
+    parts.append(f"{emoji} **TOTAL POINTS TODAY: {round(daily_points, 5)}**")
+    parts.append("")
     
-    return message
+    return "\n".join(parts)
+
+async def generate_status_message(current_positions, current_pending_orders, daily_closed_positions, daily_points, cancelled_orders=None, now=None):
+    """Generate a status message showing the current trading day overview, returned as (header, body).
+    `now` is the current UTC datetime; it is read from the clock when omitted.
+    The body is only re-rendered when the tracked state changes, so an unchanged body is the same object."""
+    global _status_state_key, _status_body, _header_second, _status_header
+    
+    # Get current time in UTC
+    now_utc = now if now is not None else datetime.datetime.now(_UTC)
+    
+    # The header only shows whole seconds, so format it at most once per second
+    second = int(now_utc.timestamp())
+    if second != _header_second:
+        # Format the date and time with timezone
+        date_str = now_utc.strftime("%d %b %Y")
+        time_str = now_utc.strftime("%H:%M:%S %Z")  # Added %Z for timezone abbreviation
+        
+        # Header with last update timestamp
+        _status_header = f"📊 **TRADING OVERVIEW** 📊\n📅 __{date_str}__ | ⏱️ Last update: __{time_str}__\n\n"
+        _header_second = second
+    
+    # Daily lists only ever grow, and the fields shown for an open position or order never change,
+    # so counts plus the open ids identify the rendered body
+    state_key = (len(daily_closed_positions), len(cancelled_orders or ()), round(daily_points, 5),
+                 frozenset(current_positions), frozenset(current_pending_orders))
+    if state_key != _status_state_key:
+        _status_body = _render_status_body(
+            current_positions, current_pending_orders, daily_closed_positions, daily_points, cancelled_orders)
+        _status_state_key = state_key
+    
+    return _status_header, _status_body
 
 async def update_pinned_message(client, target_entity, status_message, pinned_message_id=None):
     """Update the pinned status message or create and pin a new one."""
@@ -186,8 +457,11 @@ async def update_pinned_message(client, target_entity, status_message, pinned_me
             await client.pin_message(target_entity, sent_message)
             msg_logger.info("New status message pinned")
             return sent_message.id
+    except FloodWaitError:
+        # Let the caller wait out the rate limit instead of retrying into it
+        raise
     except Exception as e:
-        logger.error(f"Error updating pinned message: {e}")
+        logger.error("Error updating pinned message: %s", e)
         
         # Only create a new message if it's specifically because the message doesn't exist
         if "message to edit not found" in str(e).lower() or "message not found" in str(e).lower():
@@ -196,19 +470,40 @@ async def update_pinned_message(client, target_entity, status_message, pinned_me
                 await client.pin_message(target_entity, sent_message)
                 msg_logger.info("Created new pinned message after previous was not found")
                 return sent_message.id
+            except FloodWaitError:
+                raise
             except Exception as inner_e:
-                logger.error(f"Failed to create new pinned message: {inner_e}")
+                logger.error("Failed to create new pinned message: %s", inner_e)
                 return None
-        return pinned_message_id  # Return the old ID so we can try again next time
+        return None  # Caller keeps the old ID so we can try again next time
 
-async def run_monitor(telegram_client, target_entity):
+async def run_monitor(telegram_client, target_entity, sender, pending_order_messages, processed_orders,
+                      position_messages):
+    """Watch the MetaApi terminal and post notifications and the pinned status to Telegram.
+    `pending_order_messages`, `processed_orders` and `position_messages` are owned by the caller so
+    they survive reconnects."""
+    # Imported here so only the monitor pays for loading the MetaApi SDK
+    from metaapi_cloud_sdk import MetaApi
+    
+    # Local aliases for module and attribute lookups made on every tick
+    monotonic = time.monotonic
+    extract_position = _extract_position
+    extract_order = _extract_order
+    
     # Create MetaApi connection and wait for synchronization
     api = MetaApi(METAAPI_TOKEN)
     
     while True:
         try:
+            # A failed Telegram reconnect breaks out to here; don't resync MetaApi against a dead socket
+            if not telegram_client.is_connected():
+                msg_logger.info("Reconnecting to Telegram...")
+                await telegram_client.connect()
+            
             account = await api.metatrader_account_api.get_account(METAAPI_ACCOUNT_ID)
             connection = account.get_streaming_connection()
+            terminal_listener = create_terminal_listener()
+            connection.add_synchronization_listener(terminal_listener)
 
             msg_logger.info("Connecting to MetaApi terminal...")
             await connection.connect()
@@ -217,122 +512,221 @@ async def run_monitor(telegram_client, target_entity):
             
             # Initialize tracking variables
             history_storage = connection.history_storage
-            last_positions = {}
-            position_messages = {}
-            last_pending_orders = {}
-            pending_order_messages = {}
+            current_positions = {}  # Tracked open positions, updated in place each tick
+            current_pending_orders = {}  # Tracked pending orders, updated in place each tick
             triggered_pending_map = {}
-            processed_orders = set()
             linked_orders = set()
             pending_disappeared_orders = {}
+            closing_positions = {}  # Closed positions still waiting for their closing deal
+            closing_deal_timeout = 6
+            deals_by_pos_id = {}
+            last_deals_len = 0
             order_processing_delay = 3
+            pending_batch_size = 5  # Max new pending orders announced in one message
+            tracking_compact_threshold = 1000  # Compact tracking structures once any grows past this
+            state_save_interval = 60  # Seconds between saves of the state kept across restarts
+            last_state_saved_at = monotonic()
             pinned_message_id = None
-            last_status_update_time = 0
+            last_status_text = None  # Last status body sent, used to skip identical edits
+            last_status_sent_at = 0
             min_update_interval = 2
-            today = datetime.date.today()
+            watchdog_interval = 0.5  # Max wait between ticks when nothing is due, right after activity
+            max_watchdog_interval = 5  # Watchdog wait backs off up to this while the terminal is idle
+            idle_wait = watchdog_interval
+            status_update = asyncio.Event()  # Set when the pinned status message needs refreshing
+            status_retry_limit = 3  # Failed status edits retried with backoff before waiting for the next change
+            tick_now = datetime.datetime.now(_UTC)  # Wall-clock time of the latest tick's state
+            today = tick_now.date()
             daily_closed_positions = []
             daily_points = 0
             cancelled_orders = []  # New list to track cancelled orders
+            # Notifications waiting to be sent together once per tick, including any that failed
+            # on an earlier tick. Each entry is (message store, keys to store the sent id under,
+            # message, reply_to)
+            pending_sends = []
+
+            def mark_processed(order_id):
+                """Record an order as handled, evicting the oldest once the LRU is full"""
+                processed_orders[order_id] = None
+                processed_orders.move_to_end(order_id)
+                if len(processed_orders) > tracking_compact_threshold:
+                    processed_orders.popitem(last=False)
+
+            def queue_triggered(pos_id, pending_msg):
+                """Link a triggered position to its pending order message and queue the TRIGGERED reply"""
+                triggered_pending_map[pos_id] = pending_msg
+                linked_orders.add(pos_id)
+                # The order is now a position, so its pending message must not match it again after a reconnect
+                pending_order_messages.pop(pos_id, None)
+                # Mark as processed to avoid duplicate messages
+                mark_processed(pos_id)
+                message = format_position_message(pos_id, current_positions[pos_id], triggered=True)
+                # Reply to the original pending order message, storing the sent message for when the position closes
+                pending_sends.append((position_messages, (pos_id,), message, pending_msg))
+
+            async def status_updater():
+                """Refresh the pinned status message in the background, at most once per min_update_interval"""
+                nonlocal pinned_message_id, last_status_text, last_status_sent_at
+                failed_edits = 0
+                while True:
+                    await status_update.wait()
+                    # Let changes arriving within the rate limit coalesce into a single edit
+                    await asyncio.sleep(max(last_status_sent_at + min_update_interval - monotonic(), 0))
+                    status_update.clear()
+                    try:
+                        # Stamp the header with the tick that produced this state, so its date always
+                        # matches the day the daily stats belong to
+                        status_header, status_text = await generate_status_message(
+                            current_positions, current_pending_orders, daily_closed_positions,
+                            daily_points, cancelled_orders, now=tick_now)
+                        
+                        # Ignore the header so a new timestamp alone doesn't trigger an edit. An unchanged
+                        # body is the same cached object, so the comparison short-circuits on identity
+                        if pinned_message_id is not None and status_text == last_status_text:
+                            continue
+                        
+                        status_message = status_header + status_text
+                        edited_id = pinned_message_id
+                        new_pinned_id = await update_pinned_message(
+                            telegram_client, target_entity, status_message, edited_id)
+                        # Failed attempts count too, so retries are rate limited as well
+                        last_status_sent_at = monotonic()
+                        
+                        if pinned_message_id != edited_id:
+                            # A new day reset the pinned message while the edit was in flight
+                            continue
+                        
+                        # Only update the pinned message ID if we got a valid ID back
+                        if new_pinned_id:
+                            pinned_message_id = new_pinned_id
+                            last_status_text = status_text
+                            failed_edits = 0
+                        else:
+                            # Edit failed, force a full resend on the next attempt. Retry a few times with
+                            # backoff, then leave it to the next real change so a permanent error isn't hammered
+                            last_status_text = None
+                            failed_edits += 1
+                            if failed_edits <= status_retry_limit:
+                                await asyncio.sleep(min_update_interval * 2 ** failed_edits)
+                                status_update.set()
+                    except FloodWaitError as flood_err:
+                        # Wait out the rate limit before trying again
+                        error_counts["flood_wait"] += 1
+                        logger.warning("Telegram flood wait of %ss while updating status", flood_err.seconds)
+                        last_status_sent_at = monotonic()
+                        await asyncio.sleep(flood_err.seconds + 1)
+                        status_update.set()
+                    except Exception as e:
+                        logger.error("Error refreshing status message: %s", e)
+
+            status_task = asyncio.create_task(status_updater())
 
             # Main monitoring loop
             while True:
                 try:
                     # Check if day has changed, reset daily stats if needed
-                    current_day = datetime.date.today()
+                    now = tick_now = datetime.datetime.now(_UTC)
+                    now_mono = monotonic()  # Monotonic clock for delays, immune to wall-clock jumps
+                    current_day = now.date()
                     if current_day != today:
                         daily_closed_positions = []
                         daily_points = 0
                         cancelled_orders = []  # Reset cancelled orders for new day
+                        processed_orders.clear()
+                        linked_orders.clear()
+                        triggered_pending_map.clear()
+                        # Only keep reply targets for positions and orders that are still open
+                        for pos_id in position_messages.keys() - current_positions.keys() - closing_positions.keys():
+                            del position_messages[pos_id]
+                        for order_id in (pending_order_messages.keys() - current_pending_orders.keys()
+                                         - pending_disappeared_orders.keys()):
+                            del pending_order_messages[order_id]
                         today = current_day
                         pinned_message_id = None  # Force creation of a new pinned message for the new day
-                        msg_logger.info(f"New day started: {today}. Reset daily statistics.")
+                        last_status_text = None
+                        msg_logger.info("New day started: %s. Reset daily statistics.", today)
                     
                     # Get terminal state
                     terminal_state = connection.terminal_state
                     positions = getattr(terminal_state, 'positions', [])
                     orders = terminal_state.orders  # Get pending orders
                     
-                    # Process positions
-                    current_positions = {}
-                    # Build dictionary of current positions
+                    # Process positions, updating the tracked dict in place so unchanged positions cost no writes
+                    seen_position_ids = set()
+                    new_positions = []  # Positions not seen on the previous tick, collected in the same pass
                     for pos in positions:
-                        pos_id = pos['id'] if isinstance(pos, dict) else getattr(pos, 'id', None)
+                        # Extract position details
+                        pos_id, new_open_price, new_tp, new_sl, new_trade_type, new_symbol, new_order_id = extract_position(pos)
                         if not pos_id:
                             continue
-                            
-                        # Extract position details
-                        new_open_price = pos.get('openPrice', None) if isinstance(pos, dict) else getattr(pos, 'openPrice', None)
-                        new_tp = pos.get('takeProfit', None) if isinstance(pos, dict) else getattr(pos, 'takeProfit', None)
-                        new_sl = pos.get('stopLoss', None) if isinstance(pos, dict) else getattr(pos, 'stopLoss', None)
-                        new_trade_type = pos.get('type', 'N/A') if isinstance(pos, dict) else getattr(pos, 'type', 'N/A')
-                        new_symbol = pos.get('symbol', 'N/A') if isinstance(pos, dict) else getattr(pos, 'symbol', 'N/A')
-                        new_order_id = pos.get('orderId', None) if isinstance(pos, dict) else getattr(pos, 'orderId', None)
-                        new_symbol = new_symbol.replace('.s', '')
+                        seen_position_ids.add(pos_id)
                         
                         # If we have seen this position before, preserve its initial values
-                        if pos_id in last_positions:
-                            old_price, old_tp, old_sl, old_type, old_symbol, old_order_id = last_positions[pos_id]
-                            current_positions[pos_id] = (old_price, old_tp, old_sl, old_type, old_symbol, old_order_id or new_order_id)
-                        else:
-                            current_positions[pos_id] = (new_open_price, new_tp, new_sl, new_trade_type, new_symbol, new_order_id)
+                        old_position = current_positions.get(pos_id)
+                        if old_position is None:
+                            # Resolve the trade direction once, when the position is first seen
+                            new_action = _POSITION_ACTIONS.get(new_trade_type, "SELL")
+                            current_positions[pos_id] = PositionState(
+                                new_open_price, new_tp, new_sl, new_trade_type, new_symbol, new_order_id, new_action)
+                            new_positions.append(pos_id)
+                        elif old_position.order_id is None and new_order_id is not None:
+                            current_positions[pos_id] = old_position._replace(order_id=new_order_id)
+                    
+                    # Let MetaApi and Telegram I/O run between the bulk passes on large accounts
+                    await asyncio.sleep(0)
                     
-                    # Process pending orders
-                    current_pending_orders = {}
+                    # Process pending orders, keeping their latest values
+                    seen_order_ids = set()
+                    new_pending_orders = []
                     for order in orders:
-                        order_id = order['id'] if isinstance(order, dict) else getattr(order, 'id', None)
+                        order_id, price, tp, sl, trade_type, symbol = extract_order(order)
                         if not order_id:
                             continue
+                        seen_order_ids.add(order_id)
                         
-                        price = order.get('openPrice', None) if isinstance(order, dict) else getattr(order, 'openPrice', None)
-                        tp = order.get('takeProfit', None) if isinstance(order, dict) else getattr(order, 'takeProfit', None)
-                        sl = order.get('stopLoss', None) if isinstance(order, dict) else getattr(order, 'stopLoss', None)
-                        trade_type = order.get('type', 'N/A') if isinstance(order, dict) else getattr(order, 'type', 'N/A')
-                        symbol = order.get('symbol', 'N/A') if isinstance(order, dict) else getattr(order, 'symbol', 'N/A')
-                        symbol = symbol.replace('.s', '')
-                        
-                        current_pending_orders[order_id] = (price, tp, sl, trade_type, symbol)
+                        if order_id not in current_pending_orders:
+                            new_pending_orders.append(order_id)
+                        current_pending_orders[order_id] = PendingOrderState(price, tp, sl, trade_type, symbol)
+                    
+                    await asyncio.sleep(0)
+                    
+                    # Remove orders that are gone, keeping their last state for the trigger/cancel check
+                    disappeared_orders = {order_id: current_pending_orders.pop(order_id)
+                                          for order_id in current_pending_orders.keys() - seen_order_ids}
                     
-                    # Process closed positions 
-                    closed_positions = [pid for pid in last_positions if pid not in current_positions]
+                    # Queue closed positions until their closing deal shows up in history
+                    closed_positions = current_positions.keys() - seen_position_ids
                     for pos_id in closed_positions:
-                        # Find the closing deal with multiple retries if needed
-                        max_retries = 10
-                        retry_count = 0
-                        delay = 0.1  # starting delay in seconds
-                        closed_deals = []
-                        
-                        while retry_count < max_retries and not closed_deals:
-                            closed_deals = [
-                                deal for deal in history_storage.deals 
-                                if deal.get("positionId") == pos_id and deal.get("entryType") == "DEAL_ENTRY_OUT"
-                            ]
-                            
-                            if closed_deals:
-                                # Found the closing deal, break the loop
-                                msg_logger.info(f"Found closing deal for position {pos_id} after {retry_count} retries")
-                                break
-                                
-                            # Wait before trying again with increasing delay
-                            retry_count += 1
-                            await asyncio.sleep(delay)
-                            # Increase delay for next attempt (capped at 1 second)
-                            delay = min(delay * 1.5, 1.0)
-                            
-                            # Refresh history storage if possible
-                            try:
-                                await connection.refresh_history_storage()
-                                msg_logger.info(f"Refreshed history storage while searching for position {pos_id} closing deal")
-                            except Exception as refresh_err:
-                                logger.warning(f"Could not refresh history: {refresh_err}")
+                        closing_positions[pos_id] = (now_mono, current_positions.pop(pos_id))
+                    
+                    # Index the first closing deal per position, only looking at deals added since the last tick.
+                    # If the history shrank (e.g. after a resync), rebuild the index from scratch
+                    deals = history_storage.deals
+                    if len(deals) != last_deals_len:
+                        if len(deals) < last_deals_len:
+                            deals_by_pos_id = {}
+                            last_deals_len = 0
+                        for deal in deals[last_deals_len:]:
+                            if deal.get("entryType") == "DEAL_ENTRY_OUT":
+                                deals_by_pos_id.setdefault(deal.get("positionId"), deal)
+                        last_deals_len = len(deals)
+                    
+                    # Process closed positions whose deal was found or whose wait has expired
+                    resolved_positions = [
+                        pos_id for pos_id, (queued_at, _) in closing_positions.items()
+                        if pos_id in deals_by_pos_id or now_mono - queued_at >= closing_deal_timeout
+                    ]
+                    for pos_id in resolved_positions:
+                        _, position_data = closing_positions.pop(pos_id)
+                        closing_deal = deals_by_pos_id.get(pos_id)
                         
-                        if closed_deals:
+                        if closing_deal is not None:
                             # Process the closing deal as before
-                            closing_deal = closed_deals[0]
                             closing_price = closing_deal.get("price")
-                            open_price, tp, sl, trade_type, symbol, _ = last_positions.get(pos_id, (None, None, None, None, "N/A", None))
+                            open_price, tp, sl, trade_type, symbol, _, action = position_data
                             if closing_price is not None and open_price is not None:
                                 # Calculate delta based on trade direction
-                                if "buy" in trade_type.lower():
+                                if action == "BUY":
                                     delta = closing_price - open_price
                                     # For a BUY: if closing_price is within 5% of the range up to TP:
                                     if tp is not None and closing_price >= open_price + 0.95*(tp - open_price):
@@ -365,55 +759,31 @@ async def run_monitor(telegram_client, target_entity):
                                 daily_points += delta
                                 
                                 # Format the message based on reason and delta
-                                if reason == "Closed via TP":
-                                    message = (
-                                        f"**🤑 TP {symbol}**\n"
-                                        f"__ID: {pos_id}__\n\n"
-                                        f"💰 Closing Price: {closing_price}\n 📊 Points: {delta}"
-                                    )
-                                elif reason == "Closed via SL":
-                                    message = (
-                                        f"**⛔️ SL {symbol}**\n"
-                                        f"__ID: {pos_id}__\n\n"
-                                        f"💰 Closing Price: {closing_price}\n 📊 Points: {delta}"
-                                    )
-                                else:
-                                    # Choose emoji based on whether delta is positive or negative
-                                    header_emoji = "✅" if delta > 0 else "❌"
-                                    message = (
-                                        f"**{header_emoji} CLOSE {symbol}**\n"
-                                        f"__ID: {pos_id}__\n\n"
-                                        f"💰 Closing Price: {closing_price}\n 📊 Points: {delta}"
-                                    )
+                                # (the emoji is only used by manual closes: positive or negative delta)
+                                message = _CLOSE_TEMPLATES[reason].format(
+                                    emoji="✅" if delta > 0 else "❌", symbol=symbol, pos_id=pos_id,
+                                    closing_price=closing_price, delta=delta)
                                 
                                 # Get the message ID of the original open position to reply to it
                                 reply_to_message = position_messages.get(pos_id)
-                                await send_telegram_message(telegram_client, target_entity, message, reply_to=reply_to_message)
+                                pending_sends.append((None, (), message, reply_to_message))
                                 
                                 # Remove the message ID from tracking as position is now closed
-                                if pos_id in position_messages:
-                                    del position_messages[pos_id]
+                                position_messages.pop(pos_id, None)
                             else:
-                                await send_telegram_message(telegram_client, target_entity,
-                                    f"🔴 **CLOSE {symbol}**\nID: {pos_id}\n\nMissing price data.")
+                                pending_sends.append((None, (), f"🔴 **CLOSE {symbol}**\nID: {pos_id}\n\nMissing price data.", None))
                         else:
-                            # After exhausting all retries, send failure message
-                            open_price, tp, sl, trade_type, symbol, _ = last_positions.get(pos_id, (None, None, None, None, "N/A", None))
-                            msg_logger.warning(f"Failed to find closing deal for position {pos_id} after {max_retries} retries")
-                            await send_telegram_message(telegram_client, target_entity,
-                                f"🔴 **CLOSE {symbol}**\nID: {pos_id}\n\nNo closing deal found after multiple attempts.")
-                        
-                        # Update the pinned status message after each position closes
-                        status_message = await generate_status_message(
-                            current_positions, current_pending_orders, daily_closed_positions, daily_points)
-                        pinned_message_id = await update_pinned_message(
-                            telegram_client, target_entity, status_message, pinned_message_id)
+                            # After waiting long enough, send failure message
+                            symbol = position_data.symbol
+                            msg_logger.warning("Failed to find closing deal for position %s after %ss", pos_id, closing_deal_timeout)
+                            pending_sends.append((None, (),
+                                f"🔴 **CLOSE {symbol}**\nID: {pos_id}\n\nNo closing deal found after multiple attempts.", None))
                     
-                    # Find newly disappeared orders and queue them for delayed processing
-                    disappeared_orders = [order_id for order_id in last_pending_orders if order_id not in current_pending_orders]
-                    update_needed = False  # Flag to track if we need to update the pinned message
+                    # Flag to track if we need to update the pinned message
+                    update_needed = bool(resolved_positions)
                     
-                    for order_id in disappeared_orders:
+                    # Handle newly disappeared orders, queueing them for delayed processing
+                    for order_id, order_data in disappeared_orders.items():
                         # Skip if already processed or already in queue
                         if order_id in processed_orders or order_id in pending_disappeared_orders:
                             continue
@@ -421,57 +791,40 @@ async def run_monitor(telegram_client, target_entity):
                         # Check if this order has immediately become a position (no need for delay)
                         if order_id in current_positions:
                             # Handle it immediately as a triggered order
-                            price, tp, sl, trade_type, symbol = last_pending_orders.get(order_id, (None, None, None, None, "N/A"))
-                            msg_logger.info(f"Order {order_id} was immediately detected as a position")
+                            msg_logger.info("Order %s was immediately detected as a position", order_id)
                             
                             # Link the pending order message to the position
-                            if order_id in pending_order_messages and order_id not in linked_orders:
-                                triggered_pending_map[order_id] = pending_order_messages[order_id]
-                                linked_orders.add(order_id)
-                                
+                            pending_msg = pending_order_messages.get(order_id)
+                            if pending_msg is not None and order_id not in linked_orders:
                                 # Since this order is now a position, send a "triggered" message
-                                position_data = current_positions[order_id]
-                                open_price, tp, sl, trade_type, symbol, _ = position_data
-                                action = "BUY" if "buy" in trade_type.lower() else "SELL"
-                                market_emoji = "📈" if action == "BUY" else "📉"
-                                
-                                message = (
-                                    f"**{market_emoji} TRIGGERED {action} {symbol}**\n"
-                                    f"__ID: {order_id}__\n\n"
-                                    f"💵 Entry Price: {open_price}\n"
-                                    f"⛔️ SL: `{sl}`   ✅ TP: `{tp}`\n\n"
-                                )
-                                
-                                # Reply to the original pending order message
-                                reply_to = pending_order_messages.get(order_id)
-                                sent_message = await send_telegram_message(telegram_client, target_entity, message, reply_to=reply_to)
-                                
-                                # Store the message for when the position closes
-                                position_messages[order_id] = sent_message
+                                queue_triggered(order_id, pending_msg)
                             
                             # Mark as processed
-                            processed_orders.add(order_id)
+                            mark_processed(order_id)
                         else:
-                            # Add to delayed queue with current timestamp
-                            price, tp, sl, trade_type, symbol = last_pending_orders.get(order_id, (None, None, None, None, "N/A"))
-                            pending_disappeared_orders[order_id] = (time.time(), (price, tp, sl, trade_type, symbol))
-                            msg_logger.info(f"Order {order_id} disappeared, will check if triggered after {order_processing_delay}s delay")
+                            # Add to the delayed queue with current timestamp. Orders already queued are
+                            # skipped above, so insertion order stays timestamp order
+                            pending_disappeared_orders[order_id] = (now_mono, order_data)
+                            msg_logger.info("Order %s disappeared, will check if triggered after %ss delay", order_id, order_processing_delay)
                         
                         # Set flag that we need to update the pinned message
                         update_needed = True
                     
-                    # Process orders in the delayed queue that have waited long enough
-                    current_time = time.time()
-                    orders_to_process = [order_id for order_id, (timestamp, _) in pending_disappeared_orders.items() 
-                                        if current_time - timestamp >= order_processing_delay]
+                    # Pop orders in the delayed queue that have waited long enough. The queue is in
+                    # insertion order, which is timestamp order, so stop at the first order still waiting
+                    orders_to_process = []
+                    for order_id, (timestamp, _) in pending_disappeared_orders.items():
+                        if now_mono - timestamp < order_processing_delay:
+                            break
+                        orders_to_process.append(order_id)
+                    ready_orders = [(order_id, pending_disappeared_orders.pop(order_id)[1]) for order_id in orders_to_process]
                     
                     # Process orders that have waited the required delay time
-                    for order_id in orders_to_process:
+                    for order_id, order_data in ready_orders:
                         # Skip if already processed
                         if order_id in processed_orders:
                             continue
                         
-                        order_data = pending_disappeared_orders[order_id][1]
                         price, tp, sl, trade_type, symbol = order_data
                         
                         # KEY LOGIC: Check if this order's ID now exists as a position ID
@@ -479,35 +832,16 @@ async def run_monitor(telegram_client, target_entity):
                         triggered = order_id in current_positions
                         
                         if triggered:
-                            msg_logger.info(f"Order {order_id} ({symbol}) was triggered")
+                            msg_logger.info("Order %s (%s) was triggered", order_id, symbol)
                             
                             # Link the pending order message to the position for future reference
-                            if order_id in pending_order_messages and order_id not in linked_orders:
-                                triggered_pending_map[order_id] = pending_order_messages[order_id]
-                                linked_orders.add(order_id)
-                                
+                            pending_msg = pending_order_messages.get(order_id)
+                            if pending_msg is not None and order_id not in linked_orders:
                                 # Since this order is now a position, we need to send a "triggered" message
-                                position_data = current_positions[order_id]
-                                open_price, tp, sl, trade_type, symbol, _ = position_data
-                                action = "BUY" if "buy" in trade_type.lower() else "SELL"
-                                market_emoji = "📈" if action == "BUY" else "📉"
-                                
-                                message = (
-                                    f"**{market_emoji} TRIGGERED {action} {symbol}**\n"
-                                    f"__ID: {order_id}__\n\n"
-                                    f"💵 Entry Price: {open_price}\n"
-                                    f"⛔️ SL: `{sl}`   ✅ TP: `{tp}`\n\n"
-                                )
-                                
-                                # Reply to the original pending order message
-                                reply_to = pending_order_messages.get(order_id)
-                                sent_message = await send_telegram_message(telegram_client, target_entity, message, reply_to=reply_to)
-                                
-                                # Store the message for when the position closes
-                                position_messages[order_id] = sent_message
+                                queue_triggered(order_id, pending_msg)
                         else:
                             # If not triggered after waiting, it was canceled
-                            msg_logger.info(f"Order {order_id} ({symbol}) was canceled")
+                            msg_logger.info("Order %s (%s) was canceled", order_id, symbol)
                             
                             # Add to cancelled orders list
                             cancelled_orders.append({
@@ -517,247 +851,212 @@ async def run_monitor(telegram_client, target_entity):
                                 'price': price
                             })
                             
-                            message = (
-                                f"**🚫 CANCELED ORDER {symbol}**\n"
-                                f"__ID: {order_id}__\n\n"
-                                f"Order was canceled before being triggered"
-                            )
+                            message = _CANCELED_TEMPLATE.format(symbol=symbol, order_id=order_id)
                             
                             # Reply to the original pending order message
                             reply_to = pending_order_messages.get(order_id)
-                            await send_telegram_message(telegram_client, target_entity, message, reply_to=reply_to)
+                            pending_sends.append((None, (), message, reply_to))
                             
                             # Remove from pending tracking since it's closed
-                            if order_id in pending_order_messages:
-                                del pending_order_messages[order_id]
+                            pending_order_messages.pop(order_id, None)
                         
-                        # Mark as processed and remove from queue
-                        processed_orders.add(order_id)
-                        del pending_disappeared_orders[order_id]
+                        # Mark as processed
+                        mark_processed(order_id)
                         
                         # Set flag that we need to update the pinned message
                         update_needed = True
                     
                     # Process new positions (that were not from pending orders)
-                    new_positions = [pid for pid in current_positions if pid not in last_positions]
                     for pos_id in new_positions:
-                        # Skip positions that came from pending orders - we already handled them
-                        if pos_id in linked_orders:
+                        # Skip positions that came from pending orders - we already handled them - and
+                        # positions already announced before a reconnect
+                        if pos_id in linked_orders or pos_id in processed_orders or pos_id in position_messages:
                             continue
                         
-                        # If this position ID matches a currently pending order, it's a triggered order
-                        # Handle it immediately without waiting for the order to disappear
-                        if pos_id in current_pending_orders:
-                            msg_logger.info(f"New position {pos_id} matches a current pending order - handling as triggered")
-                            
-                            # Link the pending order message to the position
-                            if pos_id in pending_order_messages and pos_id not in linked_orders:
-                                triggered_pending_map[pos_id] = pending_order_messages[pos_id]
-                                linked_orders.add(pos_id)
-                                
-                                # Get the position data
-                                open_price, tp, sl, trade_type, symbol, _ = current_positions[pos_id]
-                                action = "BUY" if "buy" in trade_type.lower() else "SELL"
-                                market_emoji = "📈" if action == "BUY" else "📉"
-                                
-                                # Create and send triggered message
-                                message = (
-                                    f"**{market_emoji} TRIGGERED {action} {symbol}**\n"
-                                    f"__ID: {pos_id}__\n\n"
-                                    f"💵 Entry Price: {open_price}\n"
-                                    f"⛔️ SL: `{sl}`   ✅ TP: `{tp}`\n\n"
-                                )
-                                
-                                # Reply to the original pending order message
-                                reply_to = pending_order_messages.get(pos_id)
-                                sent_message = await send_telegram_message(telegram_client, target_entity, message, reply_to=reply_to)
-                                
-                                # Store the message for when the position closes
-                                position_messages[pos_id] = sent_message
-                                
-                                # Mark as processed to avoid duplicate messages
-                                processed_orders.add(pos_id)
-                                continue
-                        
-                        # If this position ID matches any pending order we're tracking (but was just triggered)
-                        if pos_id in pending_order_messages and pos_id not in linked_orders:
-                            msg_logger.info(f"New position {pos_id} matches a known pending order - handling as triggered")
-                            
-                            # Link the pending order message to the position
-                            triggered_pending_map[pos_id] = pending_order_messages[pos_id]
-                            linked_orders.add(pos_id)
-                            
-                            # Get the position data
-                            open_price, tp, sl, trade_type, symbol, _ = current_positions[pos_id]
-                            action = "BUY" if "buy" in trade_type.lower() else "SELL"
-                            market_emoji = "📈" if action == "BUY" else "📉"
-                            
-                            # Create and send triggered message
-                            message = (
-                                f"**{market_emoji} TRIGGERED {action} {symbol}**\n"
-                                f"__ID: {pos_id}__\n\n"
-                                f"💵 Entry Price: {open_price}\n"
-                                f"⛔️ SL: `{sl}`   ✅ TP: `{tp}`\n\n"
-                            )
-                            
-                            # Reply to the original pending order message
-                            reply_to = pending_order_messages.get(pos_id)
-                            sent_message = await send_telegram_message(telegram_client, target_entity, message, reply_to=reply_to)
-                            
-                            # Store the message for when the position closes
-                            position_messages[pos_id] = sent_message
-                            
-                            # Mark as processed to avoid duplicate messages
-                            processed_orders.add(pos_id)
+                        # A position with a pending order message is a triggered order. Handle it
+                        # immediately, without waiting for the order to disappear
+                        pending_msg = pending_order_messages.get(pos_id)
+                        if pending_msg is not None:
+                            msg_logger.info("New position %s matches a pending order - handling as triggered", pos_id)
+                            queue_triggered(pos_id, pending_msg)
                             continue
                         
                         # For direct market orders (not from pending)
-                        open_price, tp, sl, trade_type, symbol, _ = current_positions[pos_id]
-                        action = "BUY" if "buy" in trade_type.lower() else "SELL"
-                        market_emoji = "📈" if action == "BUY" else "📉"
-                        
-                        message = (
-                            f"**{market_emoji} {action} {symbol}**\n"
-                            f"__ID: {pos_id}__\n\n"
-                            f"💵 Entry Price: {open_price}\n"
-                            f"⛔️ SL: `{sl}`   ✅ TP: `{tp}`\n\n"
-                        )
+                        message = format_position_message(pos_id, current_positions[pos_id])
                         
                         # Store the message ID for later use when position closes
-                        sent_message = await send_telegram_message(telegram_client, target_entity, message)
-                        position_messages[pos_id] = sent_message
+                        pending_sends.append((position_messages, (pos_id,), message, None))
                         
                         # Set flag that we need to update the pinned message
                         update_needed = True
                     
                     # Send messages for new pending orders
-                    new_pending_orders = [order_id for order_id in current_pending_orders if order_id not in last_pending_orders]
+                    pending_batch = []
                     for order_id in new_pending_orders:
-                        # Skip if already processed or if already tracking as a position
-                        if order_id in processed_orders or order_id in position_messages:
+                        # Skip if already processed, already announced (e.g. before a reconnect),
+                        # or if already tracking as a position
+                        if (order_id in processed_orders or order_id in pending_order_messages
+                                or order_id in current_positions or order_id in position_messages):
                             continue
                         
                         price, tp, sl, trade_type, symbol = current_pending_orders[order_id]
                         
                         # Determine order type and appropriate emoji
-                        order_emoji = "🔷"  # Default pending order emoji
-                        if "BUY_LIMIT" in trade_type:
-                            action = "BUY LIMIT"
-                            order_emoji = "🔹"
-                        elif "BUY_STOP" in trade_type:
-                            action = "BUY STOP"
-                            order_emoji = "🔹"
-                        elif "SELL_LIMIT" in trade_type:
-                            action = "SELL LIMIT"
-                            order_emoji = "🔸"
-                        elif "SELL_STOP" in trade_type:
-                            action = "SELL STOP"
-                            order_emoji = "🔸"
-                        else:
-                            action = trade_type
+                        action, order_emoji = _ORDER_META.get(trade_type, (trade_type, _DEFAULT_ORDER_EMOJI))
                         
-                        message = (
-                            f"**{order_emoji} PENDING {action} {symbol}**\n"
-                            f"__ID: {order_id}__\n\n"
-                            f"💵 Trigger Price: {price}\n"
-                            f"⛔️ SL: `{sl}`   ✅ TP: `{tp}`\n\n"
-                        )
+                        message = _PENDING_TEMPLATE.format_map({
+                            "emoji": order_emoji, "action": action, "symbol": symbol, "order_id": order_id,
+                            "price": price, "sl": sl, "tp": tp})
                         
-                        # Store the message ID for later use
-                        sent_message = await send_telegram_message(telegram_client, target_entity, message)
-                        pending_order_messages[order_id] = sent_message
-                        msg_logger.info(f"Sent message for new pending order {order_id}")
+                        pending_batch.append((order_id, message))
                         
                         # Set flag that we need to update the pinned message
                         update_needed = True
+                    
+                    # Queue the new pending order notifications, combining up to pending_batch_size
+                    # orders per message (e.g. after a reconnect)
+                    if pending_batch:
+                        for start in range(0, len(pending_batch), pending_batch_size):
+                            batch = pending_batch[start:start + pending_batch_size]
+                            # Each message ends with a blank line, which separates the orders. Every
+                            # order in a batch replies to the message that announced it
+                            pending_sends.append((pending_order_messages, tuple(order_id for order_id, _ in batch),
+                                                  "".join(message for _, message in batch), None))
+                    
+                    # Send this tick's notifications, and any that failed on an earlier tick, concurrently
+                    await flush_sends(sender, pending_sends)
+                    if pending_batch:
+                        msg_logger.info("Sent messages for new pending orders %s",
+                                        ', '.join(str(order_id) for order_id, _ in pending_batch))
 
-                    # Update the pinned status message if needed and not too frequent
-                    current_time = time.time()
-                    if (pinned_message_id is None or 
-                        update_needed and current_time - last_status_update_time >= min_update_interval):
-                        
-                        status_message = await generate_status_message(
-                            current_positions, current_pending_orders, daily_closed_positions, 
-                            daily_points, cancelled_orders)
-                        
-                        new_pinned_id = await update_pinned_message(
-                            telegram_client, target_entity, status_message, pinned_message_id)
-                        
-                        # Only update the pinned message ID if we got a valid ID back
-                        if new_pinned_id:
-                            pinned_message_id = new_pinned_id
-                            last_status_update_time = current_time
+                    # Hand status changes to the background updater, which rate limits the edits
+                    if update_needed or pinned_message_id is None:
+                        status_update.set()
+                    
+                    # Back the watchdog off while nothing changes, and reset it as soon as something does
+                    if update_needed or new_positions or new_pending_orders or closed_positions:
+                        idle_wait = watchdog_interval
+                    else:
+                        idle_wait = min(idle_wait * 1.5, max_watchdog_interval)
+                    
+                    # Wait for MetaApi to report a change or for the next queued deadline to come due,
+                    # falling back to a periodic watchdog tick
+                    deadlines = []
+                    if pending_disappeared_orders:
+                        # The oldest queued order is due first
+                        queued_at, _ = next(iter(pending_disappeared_orders.values()))
+                        deadlines.append(queued_at + order_processing_delay)
+                    deadlines += [queued_at + closing_deal_timeout for queued_at, _ in closing_positions.values()]
+                    wait_timeout = idle_wait
+                    if deadlines:
+                        wait_timeout = min(wait_timeout, max(min(deadlines) - monotonic(), 0))
+                    try:
+                        await asyncio.wait_for(terminal_listener.changed.wait(), timeout=wait_timeout)
+                    except asyncio.TimeoutError:
+                        pass
+                    terminal_listener.changed.clear()
                     
-                    # Save state for next cycle
-                    last_positions = current_positions
-                    last_pending_orders = current_pending_orders
-                    await asyncio.sleep(0.1)
+                    # Periodically save the state that lets a restart skip re-announcing known orders
+                    if monotonic() - last_state_saved_at >= state_save_interval:
+                        save_monitor_state(pending_order_messages, processed_orders, position_messages)
+                        last_state_saved_at = monotonic()
                     
-                    # Periodically clean up processed_orders to avoid memory leaks
-                    if len(processed_orders) > 1000:
-                        relevant_orders = set(pending_order_messages.keys()).union(linked_orders)
-                        processed_orders = processed_orders.intersection(relevant_orders)
+                    # Periodically clean up tracking structures to avoid memory leaks
+                    if max(len(pending_order_messages), len(position_messages),
+                           len(triggered_pending_map), len(linked_orders)) > tracking_compact_threshold:
+                        # Drop entries for positions and orders that are no longer open or awaiting processing
+                        open_ids = current_positions.keys() | current_pending_orders.keys()
+                        for order_id in (pending_order_messages.keys() - current_pending_orders.keys()
+                                         - pending_disappeared_orders.keys() - linked_orders):
+                            pending_order_messages.pop(order_id, None)
+                        for pos_id in position_messages.keys() - current_positions.keys() - closing_positions.keys():
+                            position_messages.pop(pos_id, None)
+                        for pos_id in triggered_pending_map.keys() - current_positions.keys():
+                            triggered_pending_map.pop(pos_id, None)
+                        linked_orders.intersection_update(open_ids)
                         
                 except TypeNotFoundError as tl_err:
                     # Specific handling for Telethon TypeNotFoundError
-                    logger.warning(f"Telegram protocol error, reconnecting: {tl_err}")
+                    error_counts["telegram_protocol"] += 1
+                    logger.warning("Telegram protocol error, reconnecting: %s", tl_err)
                     
                     # Try to safely disconnect and reconnect the Telegram client
                     try:
                         await telegram_client.disconnect()
                     except Exception as disconnect_err:
-                        logger.error(f"Error disconnecting Telegram client: {disconnect_err}")
+                        logger.error("Error disconnecting Telegram client: %s", disconnect_err)
                     
                     # Wait before reconnecting
                     await asyncio.sleep(5)
                     
                     try:
                         await telegram_client.connect()
-                        # Get the target entity again
-                        target_entity = await telegram_client.get_entity(int(FORWARD_CHANNEL_ID))
+                        # Get the target entity again, from the client's entity cache when possible
+                        target_entity = await telegram_client.get_input_entity(_FORWARD_CHANNEL_ID_INT)
+                        sender.target_entity = target_entity
                         logger.info("Telegram client reconnected.")
                     except Exception as reconnect_err:
-                        logger.error(f"Failed to reconnect Telegram client: {reconnect_err}")
+                        logger.error("Failed to reconnect Telegram client: %s", reconnect_err)
                         # Break out of the inner loop to fully restart connections
                         break
                     
-                except (AuthKeyDuplicatedError, ServerError, FloodWaitError) as tg_err:
+                except FloodWaitError as flood_err:
+                    # Telegram rate limit - wait it out and keep the MetaApi connection. Failed sends
+                    # stay queued for the next tick, and the status picks up this tick's changes
+                    error_counts["flood_wait"] += 1
+                    status_update.set()
+                    logger.warning("Telegram flood wait of %ss (%s so far), pausing monitor",
+                                   flood_err.seconds, error_counts["flood_wait"])
+                    await asyncio.sleep(flood_err.seconds + 1)
+                    
+                except (AuthKeyDuplicatedError, ServerError) as tg_err:
                     # Handle other Telegram-specific errors
-                    logger.warning(f"Telegram error: {tg_err}")
+                    error_counts["telegram"] += 1
+                    logger.warning("Telegram error: %s", tg_err)
                     # Break out to restart connections
                     break
                     
                 except aiohttp.ClientError as http_err:
                     # Handle aiohttp errors (network issues)
-                    logger.warning(f"Network error: {http_err}")
+                    error_counts["network"] += 1
+                    logger.warning("Network error: %s", http_err)
                     await asyncio.sleep(5)
                     # Continue to retry in the current loop
                     
                 except Exception as inner_e:
-                    logger.error(f"Error in monitoring loop: {inner_e}")
+                    error_counts["unexpected"] += 1
+                    logger.error("Error in monitoring loop: %s", inner_e)
                     # For other unexpected errors, break out to restart connections
                     break
                     
         except Exception as outer_e:
-            logger.error(f"MetaAPI connection error: {outer_e}")
+            logger.error("MetaAPI connection error: %s", outer_e)
             
-        # Clean up MetaAPI connection before retrying
+        # Stop the status updater, save state and clean up MetaAPI connection before retrying
+        if 'status_task' in locals():
+            status_task.cancel()
+        save_monitor_state(pending_order_messages, processed_orders, position_messages)
         try:
             if 'connection' in locals() and connection:
+                if 'terminal_listener' in locals():
+                    connection.remove_synchronization_listener(terminal_listener)
                 await connection.close()
                 msg_logger.info("Closed MetaAPI connection")
         except Exception as cleanup_err:
-            logger.error(f"Error closing MetaAPI connection: {cleanup_err}")
+            logger.error("Error closing MetaAPI connection: %s", cleanup_err)
             
         # Wait before reconnecting
-        logger.warning("Waiting 5 seconds before reconnecting...")
-        await asyncio.sleep(5)
+        logger.warning("Waiting 5-7 seconds before reconnecting...")
+        await asyncio.sleep(5 + random.random() * 2)
         msg_logger.info("Attempting to reconnect to MetaAPI...")
 
 async def main():
     session_string = load_session_string()
     telegram_client = None
     
+    # Notification tracking kept across monitor restarts and saved between runs
+    pending_order_messages, processed_orders, position_messages = load_monitor_state()
+    
     # Outer loop for the entire program
     while True:
         try:
@@ -777,13 +1076,20 @@ async def main():
                     msg_logger.info("Telegram client connected and authorized")
             
             # Get the target entity
-            target_entity = await telegram_client.get_entity(int(FORWARD_CHANNEL_ID))
+            target_entity = await telegram_client.get_entity(_FORWARD_CHANNEL_ID_INT)
             
-            # Run the monitor
-            await run_monitor(telegram_client, target_entity)
+            # Run the monitor, pacing its notifications through a background sender
+            sender = TelegramSender(telegram_client, target_entity)
+            sender.start()
+            try:
+                await run_monitor(telegram_client, target_entity, sender, pending_order_messages, processed_orders,
+                                  position_messages)
+            finally:
+                await sender.stop()
+                save_monitor_state(pending_order_messages, processed_orders, position_messages)
             
         except TypeNotFoundError as tl_err:
-            logger.warning(f"Telegram protocol error in main loop: {tl_err}")
+            logger.warning("Telegram protocol error in main loop: %s", tl_err)
             
             # Clean up and recreate telegram client
             try:
@@ -794,7 +1100,7 @@ async def main():
                 pass
             
         except Exception as e:
-            logger.error(f"Main loop error: {e}")
+            logger.error("Main loop error: %s", e)
             
             # Clean up resources
             try:
@@ -804,14 +1110,16 @@ async def main():
             except:
                 pass
         
-        # Wait before retrying
-        logger.warning("Restarting in 15 seconds...")
-        await asyncio.sleep(10)
+        # Wait before retrying, with jitter so restarts after a shared outage don't all land at once
+        logger.warning("Restarting in 10-12 seconds...")
+        await asyncio.sleep(10 + random.random() * 2)
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
         msg_logger.info("Program terminated by user")
     except Exception as e:
-        logger.critical(f"Fatal error: {e}")
+        logger.critical("Fatal error: %s", e)